@@ -11,10 +11,10 @@ Design principles:
 Author: Shingai Thornton
 """
 
+import flask
 from dash import Dash
 import dash_bootstrap_components as dbc
 
-from styles import CUSTOM_CSS
 from components import create_layout
 from callbacks import register_callbacks
 
@@ -23,8 +23,14 @@ from callbacks import register_callbacks
 # APP INITIALIZATION
 # =============================================================================
 
+# Flask-Compress reads its settings when Dash(compress=True) initializes it, so
+# the algorithm preference has to be on the server before the app is created
+server = flask.Flask(__name__)
+server.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']  # Prefer Brotli, fall back to gzip
+
 app = Dash(
     __name__,
+    server=server,
     external_stylesheets=[
         dbc.themes.DARKLY,
         'https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&display=swap'
@@ -32,32 +38,12 @@ app = Dash(
     meta_tags=[
         {"name": "viewport", "content": "width=device-width, initial-scale=1"}
     ],
-    suppress_callback_exceptions=True  # rankings-table is dynamically created
+    suppress_callback_exceptions=True,  # rankings-table is dynamically created
+    compress=True  # Flask-Compress for layout, callback and asset responses
 )
 
-# Inject custom CSS via index_string
-app.index_string = '''
-<!DOCTYPE html>
-<html>
-    <head>
-        {%metas%}
-        <title>Interstate Trade Network</title>
-        {%favicon%}
-        {%css%}
-        <style>''' + CUSTOM_CSS + '''</style>
-    </head>
-    <body>
-        {%app_entry%}
-        <footer>
-            {%config%}
-            {%scripts%}
-            {%renderer%}
-        </footer>
-    </body>
-</html>
-'''
-
-server = app.server
+# Custom CSS is served from assets/custom.css (auto-loaded and browser-cached by Dash)
+app.title = 'Interstate Trade Network'
 
 # Set layout
 app.layout = create_layout()
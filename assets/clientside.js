@@ -0,0 +1,206 @@
+/*
+ * Clientside callbacks for pure UI state (button styles, visibility, theme).
+ * These only map inputs to styles/strings, so they run in the browser with no
+ * server round-trip. Registered from callbacks/interactions.py.
+ */
+
+const HIDDEN = {display: 'none'};
+const SHOWN_BELOW = {display: 'block', marginTop: '8px'};
+
+// Container class and toggle label per theme; colors live in custom.css
+const THEMES = {
+    dark: {containerClass: 'app-container theme-dark', label: 'Dark mode'},
+    light: {containerClass: 'app-container theme-light', label: 'Light mode'}
+};
+
+// Component id of the first triggering input, or null on the initial call
+function triggeredId() {
+    const triggered = window.dash_clientside.callback_context.triggered;
+    if (!triggered || !triggered.length) {
+        return null;
+    }
+    return triggered[0].prop_id.split('.')[0] || null;
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        // Toggle between 51x51 (domestic) and 52x52 (with international).
+        // A theme toggle only recolors the buttons.
+        toggleNetworkType: function(n1, n2, darkMode, commodity, currentType) {
+            const noUpdate = window.dash_clientside.no_update;
+            const triggered = triggeredId();
+            const btnColor = darkMode ? 'light' : 'secondary';
+            if (triggered === 'dark-mode-toggle') {
+                return [noUpdate, noUpdate, btnColor, btnColor, noUpdate];
+            }
+
+            // Force domestic view when commodity is selected
+            let networkType = '51x51';
+            if ((!commodity || commodity === 'all') && triggered === 'btn-52x52') {
+                networkType = '52x52';
+            }
+            return [networkType === '52x52', networkType === '51x51', btnColor, btnColor,
+                    networkType === currentType ? noUpdate : networkType];
+        },
+
+        // Update measure button states and show/hide filtration slider.
+        // A theme toggle only recolors the buttons.
+        updateMeasureButtons: function(n1, n2, n3, darkMode, currentMeasure) {
+            const noUpdate = window.dash_clientside.no_update;
+            const triggered = triggeredId();
+            const btnColor = darkMode ? 'light' : 'secondary';
+            if (triggered === 'dark-mode-toggle') {
+                return [btnColor, btnColor, btnColor,
+                        noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+
+            let selected = currentMeasure || 'eigenvector';
+            if (triggered === 'btn-eigen') {
+                selected = 'eigenvector';
+            } else if (triggered === 'btn-outdeg') {
+                selected = 'out_degree';
+            } else if (triggered === 'btn-between') {
+                selected = 'betweenness';
+            }
+
+            const filtrationStyle = {display: selected === 'betweenness' ? 'block' : 'none'};
+
+            // Returned store values re-trigger the map, drawer and table callbacks even
+            // when equal, so the measure is only written when it changes
+            return [btnColor, btnColor, btnColor,
+                    selected !== 'eigenvector', selected !== 'out_degree', selected !== 'betweenness',
+                    filtrationStyle, selected === currentMeasure ? noUpdate : selected];
+        },
+
+        toggleEdgeCount: function(showEdges) {
+            return showEdges ? SHOWN_BELOW : HIDDEN;
+        },
+
+        // Show flow direction filter only when edges enabled AND state selected
+        toggleFlowDirectionSection: function(showEdges, selectedState) {
+            return showEdges && selectedState ? SHOWN_BELOW : HIDDEN;
+        },
+
+        // Returned store values re-trigger the map callback even when equal, so the
+        // flow-direction store is only written when the direction actually changes
+        updateFlowDirection: function(nBoth, nOut, nIn, selectedState, currentDirection) {
+            const triggered = triggeredId();
+            let direction = 'both';  // Reset on state selection change and initial load
+            if (triggered === 'btn-flow-out') {
+                direction = 'outbound';
+            } else if (triggered === 'btn-flow-in') {
+                direction = 'inbound';
+            }
+            const store = direction === currentDirection ? window.dash_clientside.no_update : direction;
+            return [direction !== 'both', direction !== 'outbound', direction !== 'inbound', store];
+        },
+
+        // Handle state selection from map clicks or table row clicks.
+        // Clicking the selected state again clears the selection.
+        selectState: function(clickData, closeClicks, activeCell, tableData, currentState) {
+            const triggered = triggeredId();
+            if (triggered === 'close-drawer') {
+                return null;
+            }
+
+            let newState = null;
+            if (triggered === 'rankings-table' && activeCell) {
+                if (tableData && activeCell.row < tableData.length) {
+                    newState = tableData[activeCell.row].Abbr;
+                }
+            } else if (clickData && clickData.points && clickData.points.length) {
+                const point = clickData.points[0];
+                if (point.customdata) {
+                    newState = point.customdata[0];
+                }
+            }
+
+            if (newState === null) {
+                return currentState;
+            }
+            return newState === currentState ? null : newState;
+        },
+
+        toggleBottomSheet: function(nClicks, currentClass) {
+            return currentClass.includes('collapsed') ? 'bottom-sheet' : 'bottom-sheet collapsed';
+        },
+
+        // Restyle the server-built (dark, unselected) map figure for the active
+        // theme and enlarge the selected state's node. Only colors and marker
+        // sizes change, so theme toggles and selections never wait on the server.
+        styleMap: function(figure, darkMode, selectedState, themes) {
+            if (!figure) {
+                return window.dash_clientside.no_update;
+            }
+            const theme = darkMode ? themes.dark : themes.light;
+
+            const data = figure.data.map(function(trace) {
+                // Sizes arrive as a plain list; anything else (e.g. a typed-array
+                // {dtype, bdata} payload) is left unhighlighted rather than failing
+                if (trace.meta === 'nodes' && selectedState &&
+                        Array.isArray(trace.marker.size) && Array.isArray(trace.customdata)) {
+                    const selected = trace.customdata.map(function(row) {
+                        return row[0] === selectedState;
+                    });
+                    trace = Object.assign({}, trace, {
+                        marker: Object.assign({}, trace.marker, {
+                            size: trace.marker.size.map(function(size, i) {
+                                return selected[i] ? size * 1.4 : size;
+                            }),
+                            opacity: selected.map(function(isSelected) {
+                                return isSelected ? 1.0 : 0.5;
+                            })
+                        })
+                    });
+                }
+                if (trace.meta === 'themed-edges') {
+                    return Object.assign({}, trace, {
+                        line: Object.assign({}, trace.line, {color: theme.edge})
+                    });
+                }
+                if (trace.marker && trace.marker.colorbar) {
+                    const colorbar = trace.marker.colorbar;
+                    const title = colorbar.title || {};
+                    return Object.assign({}, trace, {
+                        marker: Object.assign({}, trace.marker, {
+                            colorbar: Object.assign({}, colorbar, {
+                                bgcolor: theme.colorbar_bg,
+                                tickfont: Object.assign({}, colorbar.tickfont, {color: theme.font}),
+                                title: Object.assign({}, title, {
+                                    font: Object.assign({}, title.font, {color: theme.font})
+                                })
+                            })
+                        })
+                    });
+                }
+                return trace;
+            });
+
+            const layout = Object.assign({}, figure.layout, {
+                paper_bgcolor: theme.paper_bg,
+                plot_bgcolor: theme.paper_bg,
+                mapbox: Object.assign({}, figure.layout.mapbox, {style: theme.map_style})
+            });
+            return {data: data, layout: layout};
+        },
+
+        // Theme the rankings table and highlight the selected state's row
+        styleRankingsTable: function(columns, darkMode, selectedState, themes) {
+            const theme = darkMode ? themes.dark : themes.light;
+            const styles = theme.divergence.slice();
+            if (selectedState) {
+                styles.push({
+                    'if': {filter_query: '{Abbr} = "' + selectedState + '"'},
+                    backgroundColor: theme.selected_bg,
+                    fontWeight: '600'
+                });
+            }
+            return [styles, theme.cell, theme.header];
+        },
+
+        updateTheme: function(darkMode) {
+            const theme = darkMode ? THEMES.dark : THEMES.light;
+            return [theme.containerClass, theme.label];
+        }
+    }
+});
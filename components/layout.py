@@ -2,7 +2,9 @@
 
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from data_loader import num_nodes, num_edges, density, clustering_coef, reciprocity, commodity_options
+from data_loader import num_nodes, num_edges, density, clustering_coef, commodity_options
+from components.map import MAP_THEME_DATA
+from components.rankings import RANKINGS_THEME_DATA
 
 
 # Centrality measure descriptions for info popovers
@@ -22,20 +24,112 @@ MEASURE_INFO = {
 }
 
 
+# (measure, button id, info icon id, button label); eigenvector starts selected
+MEASURE_CONTROLS = (
+    ('eigenvector', 'btn-eigen', 'info-eigen', 'Eigenvector'),
+    ('out_degree', 'btn-outdeg', 'info-outdeg', 'Out-Degree'),
+    ('betweenness', 'btn-between', 'info-between', 'Betweenness'),
+)
+
+
+def _measure_control(measure, btn_id, info_id, label):
+    """Measure button with its info icon, plus the icon's hover popover."""
+    last = measure == MEASURE_CONTROLS[-1][0]
+    return [
+        html.Span([
+            dbc.Button(label, id=btn_id, color="light", size="sm", className=None if last else "me-1",
+                      n_clicks=0, outline=measure != 'eigenvector'),
+            html.Span("ⓘ", id=info_id, className="info-icon",
+                     style={'cursor': 'pointer', 'marginLeft' if last else 'marginRight': '4px'}),
+        ]),
+        dbc.Popover(
+            [
+                dbc.PopoverHeader(MEASURE_INFO[measure]['title']),
+                dbc.PopoverBody(MEASURE_INFO[measure]['description'])
+            ],
+            target=info_id, trigger="hover", placement="right"
+        ),
+    ]
+
+
+def _drawer_score_row(label, value_id, class_name="d-flex justify-content-between"):
+    """One label/value row in a drawer panel; the value is filled in by update_drawer."""
+    return html.Div([
+        html.Span(label, className="drawer-muted", style={'fontSize': '12px'}),
+        html.Span(id=value_id, style={'fontSize': '12px'})
+    ], className=class_name)
+
+
+def _drawer_body():
+    """Static state drawer skeleton; update_drawer only fills in the values."""
+    return html.Div([
+        html.Div([
+            html.Div([
+                html.Span(id='drawer-rank', className="rank-badge other"),
+                html.Span(id='drawer-rank-measure', className="drawer-muted",
+                         style={'marginLeft': '8px', 'fontSize': '13px'})
+            ]),
+            html.Div([
+                html.Small(id='drawer-gdp-rank', className="drawer-muted")
+            ], style={'marginTop': '4px'})
+        ], style={'marginBottom': '20px'}),
+
+        html.Div([
+            html.Div([
+                html.Div(id='drawer-outbound', className="metric-value"),
+                html.Div("Outbound", className="metric-label")
+            ], className="metric-card", style={'flex': '1'}),
+            html.Div([
+                html.Div(id='drawer-inbound', className="metric-value"),
+                html.Div("Inbound", className="metric-label")
+            ], className="metric-card", style={'flex': '1', 'marginLeft': '10px'}),
+        ], className="d-flex", style={'marginBottom': '20px'}),
+
+        html.Div([
+            html.Label("Centrality Scores", className="drawer-section-label"),
+            html.Div([
+                _drawer_score_row("Eigenvector", 'drawer-rank-eigenvector'),
+                _drawer_score_row("Out-Degree", 'drawer-rank-out-degree'),
+                _drawer_score_row("Betweenness", 'drawer-rank-betweenness'),
+            ], className="drawer-panel")
+        ], style={'marginBottom': '20px'}),
+
+        html.Div([
+            html.Label("Top Trading Partners", className="drawer-section-label"),
+            html.Div(id='drawer-partners')
+        ]),
+
+        html.Div([
+            html.Hr(className="drawer-divider"),
+            html.Label("GDP vs Centrality Divergence", className="drawer-section-label"),
+            html.Div([
+                _drawer_score_row("Eigenvector", 'drawer-divergence-eigenvector',
+                                  "d-flex justify-content-between mb-1"),
+                _drawer_score_row("Out-Degree", 'drawer-divergence-out-degree',
+                                  "d-flex justify-content-between mb-1"),
+                _drawer_score_row("Betweenness", 'drawer-divergence-betweenness'),
+            ], className="drawer-panel"),
+            html.Small("Green = outperforms GDP rank, Red = underperforms", className="drawer-muted",
+                      style={'fontSize': '10px', 'marginTop': '8px', 'display': 'block'})
+        ])
+    ])
+
+
 def create_layout():
     """Create the main application layout."""
     return html.Div([
         # Stores
         dcc.Store(id='selected-state', data=None),
-        dcc.Store(id='show-edges-store', data=False),
-        dcc.Store(id='table-expanded', data=False),
         dcc.Store(id='selected-measure', data='eigenvector'),
         dcc.Store(id='network-type', data='51x51'),  # '51x51' or '52x52'
         dcc.Store(id='selected-commodity', data='all'),  # SCTG code or 'all'
         dcc.Store(id='flow-direction', data='both'),  # 'both', 'outbound', 'inbound'
+        dcc.Store(id='map-figure'),  # Theme-neutral figure; themed clientside into network-map
+        dcc.Store(id='map-themes', data=MAP_THEME_DATA),
+        dcc.Store(id='rankings-themes', data=RANKINGS_THEME_DATA),
 
         # Main container
-        html.Div(id='main-container', className='theme-light', children=[
+        html.Div(id='main-container', className='app-container theme-light', children=[
             # Map
             dcc.Graph(
                 id='network-map',
@@ -43,7 +137,7 @@ def create_layout():
                     'displayModeBar': False,
                     'scrollZoom': True
                 },
-                style={'height': '100%', 'width': '100%'}
+                className='network-map'
             ),
 
             # Floating controls (top-left) - COMPACT, never expands
@@ -59,48 +153,9 @@ def create_layout():
                 html.Div([
                     html.Label("Centrality Measure", className="text-muted small mb-2 d-block"),
                     html.Div([
-                        # Eigenvector button + info
-                        html.Span([
-                            dbc.Button("Eigenvector", id="btn-eigen", color="light", size="sm",
-                                      className="me-1", n_clicks=0, outline=False),
-                            html.Span("ⓘ", id="info-eigen", className="info-icon",
-                                     style={'cursor': 'pointer', 'marginRight': '4px'}),
-                        ]),
-                        dbc.Popover(
-                            [
-                                dbc.PopoverHeader(MEASURE_INFO['eigenvector']['title']),
-                                dbc.PopoverBody(MEASURE_INFO['eigenvector']['description'])
-                            ],
-                            target="info-eigen", trigger="hover", placement="right"
-                        ),
-                        # Out-Degree button + info
-                        html.Span([
-                            dbc.Button("Out-Degree", id="btn-outdeg", color="light", size="sm",
-                                      className="me-1", n_clicks=0, outline=True),
-                            html.Span("ⓘ", id="info-outdeg", className="info-icon",
-                                     style={'cursor': 'pointer', 'marginRight': '4px'}),
-                        ]),
-                        dbc.Popover(
-                            [
-                                dbc.PopoverHeader(MEASURE_INFO['out_degree']['title']),
-                                dbc.PopoverBody(MEASURE_INFO['out_degree']['description'])
-                            ],
-                            target="info-outdeg", trigger="hover", placement="right"
-                        ),
-                        # Betweenness button + info
-                        html.Span([
-                            dbc.Button("Betweenness", id="btn-between", color="light", size="sm",
-                                      n_clicks=0, outline=True),
-                            html.Span("ⓘ", id="info-between", className="info-icon",
-                                     style={'cursor': 'pointer', 'marginLeft': '4px'}),
-                        ]),
-                        dbc.Popover(
-                            [
-                                dbc.PopoverHeader(MEASURE_INFO['betweenness']['title']),
-                                dbc.PopoverBody(MEASURE_INFO['betweenness']['description'])
-                            ],
-                            target="info-between", trigger="hover", placement="right"
-                        ),
+                        control
+                        for measure, btn_id, info_id, label in MEASURE_CONTROLS
+                        for control in _measure_control(measure, btn_id, info_id, label)
                     ], className="measure-pills", style={'display': 'flex', 'flexWrap': 'wrap', 'alignItems': 'center'})
                 ], className="mb-3"),
 
@@ -159,6 +214,7 @@ def create_layout():
                         id='filtration-slider',
                         min=0, max=3, step=1, value=0,
                         marks={0: 'All', 1: 'Top 75%', 2: 'Top 50%', 3: 'Top 25%'},
+                        updatemode='mouseup',  # One map rebuild per drag, not per step
                         className="mb-2"
                     )
                 ], style={'display': 'none'}),
@@ -187,6 +243,7 @@ def create_layout():
                             4: '500',
                             5: '1k'
                         },
+                        updatemode='mouseup',  # One map rebuild per drag, not per step
                     )
                 ], style={'display': 'none'}),
 
@@ -215,19 +272,7 @@ def create_layout():
                     )
                 ]),
 
-            ], style={
-                'position': 'absolute',
-                'top': '20px',
-                'left': '20px',
-                'zIndex': '1000',
-                'background': 'rgba(26, 26, 46, 0.9)',
-                'backdropFilter': 'blur(10px)',
-                'borderRadius': '12px',
-                'padding': '16px',
-                'minWidth': '200px',
-                'maxWidth': '240px',  # Constrain width
-                'boxShadow': '0 4px 20px rgba(0,0,0,0.3)'
-            }),
+            ], className='floating-controls'),
 
             # State detail drawer (right side)
             html.Div(id='state-drawer', className="state-drawer hidden", children=[
@@ -240,7 +285,7 @@ def create_layout():
                               className="close-btn p-0", style={'fontSize': '24px'})
                 ], className="drawer-header d-flex align-items-center"),
 
-                html.Div(id='drawer-content', className="drawer-body")
+                html.Div(_drawer_body(), id='drawer-content', className="drawer-body")
             ]),
 
             # Bottom sheet for rankings table
@@ -260,12 +305,6 @@ def create_layout():
                 html.Span(f"{num_nodes} states • {num_edges:,} edges • {density:.1%} density • {clustering_coef:.3f} clustering")
             ], className="stats-badge", id='stats-badge'),
 
-        ], style={
-            'height': '100vh',
-            'width': '100vw',
-            'position': 'relative',
-            'overflow': 'hidden',
-            'backgroundColor': '#1a1a2e'
-        })
+        ])
 
     ], style={'margin': '0', 'padding': '0', 'overflow': 'hidden'})
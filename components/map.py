@@ -1,7 +1,43 @@
 """Network map visualization component."""
 
-import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
+import plotly.graph_objects as go
+
+from data_loader import MARKER_SIZE_RANGE
+
+
+# Edge line widths are quantized so each bucket renders as a single trace
+EDGE_WIDTH_BUCKETS = 4
+
+# Per-theme colors, keyed by dark_mode
+MAP_COLORS = {
+    True: {'map_style': 'carto-darkmatter', 'paper_bg': '#1a1a2e', 'font': '#ffffff',
+           'colorbar_bg': 'rgba(0,0,0,0.3)', 'edge': 'rgba(100, 149, 237, 0.3)'},
+    False: {'map_style': 'carto-positron', 'paper_bg': '#ffffff', 'font': '#333333',
+            'colorbar_bg': 'rgba(255,255,255,0.8)', 'edge': 'rgba(70, 130, 180, 0.4)'},
+}
+
+# Same colors keyed 'dark'/'light' for the browser, which restyles theme toggles
+# without a server rebuild (see styleMap in assets/clientside.js)
+MAP_THEME_DATA = {('dark' if dark else 'light'): colors for dark, colors in MAP_COLORS.items()}
+
+# Static figure layout per theme, built once; figures only add traces on top
+MAP_LAYOUTS = {
+    dark: go.Layout(
+        mapbox=dict(
+            style=colors['map_style'],
+            center=dict(lat=39.5, lon=-98.0),
+            zoom=3.3
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor=colors['paper_bg'],
+        plot_bgcolor=colors['paper_bg'],
+        showlegend=False,
+        uirevision='constant'  # Prevents map from resetting on updates
+    )
+    for dark, colors in MAP_COLORS.items()
+}
 
 
 def create_network_map(centralities, coordinates, centrality_measure='eigenvector',
@@ -13,70 +49,73 @@ def create_network_map(centralities, coordinates, centrality_measure='eigenvecto
         rank_changes: DataFrame with columns like 'betweenness_change', 'eigenvector_change'
                      Positive = rank improved when intl added, negative = rank worsened
         network_type: '51x51' or '52x52' - only show indicators when comparing (52x52)
+
+    selected_state is still used here to pick and highlight the selected state's
+    edges. The node highlight is applied in the browser (see styleMap in
+    assets/clientside.js), so node traces do not depend on the selection.
     """
 
-    coords = coordinates.rename(columns={'state_abbr': 'state'})
-    df = centralities.merge(coords[['state', 'lat', 'lon']], on='state', how='inner')
+    if {'lat', 'lon'}.issubset(centralities.columns):
+        # Coordinates already merged in by data_loader
+        df = centralities
+    else:
+        df = centralities.merge(coordinates[['state', 'lat', 'lon']], on='state', how='inner',
+                                validate='one_to_one')
 
     # Merge rank changes if provided
     if rank_changes is not None and network_type == '52x52':
-        df = df.merge(rank_changes, on='state', how='left')
+        df = df.merge(rank_changes, on='state', how='left', validate='one_to_one')
 
-    # Sizing
-    min_size, max_size = 12, 55
-    size_values = df[centrality_measure]
-    sizes = min_size + (size_values / size_values.max()) * (max_size - min_size)
+    # Sizing (precomputed by data_loader for its datasets)
+    size_col = f'size_{centrality_measure}'
+    if size_col in df.columns:
+        sizes = df[size_col]
+    else:
+        min_size, max_size = MARKER_SIZE_RANGE
+        size_values = df[centrality_measure]
+        sizes = min_size + (size_values / size_values.max()) * (max_size - min_size)
 
     color_values = df[centrality_measure]
 
-    # Build hover text
-    has_state_name = 'state_name' in df.columns
-    has_gdp = 'gdp_billions' in df.columns
+    # Hover is composed client-side from customdata; customdata[0] stays the state
+    # abbreviation because map clicks read it.
     change_col = f'{centrality_measure}_change'
     has_rank_change = change_col in df.columns
 
-    hover_text = []
-    for _, row in df.iterrows():
-        display_name = row['state_name'] if has_state_name else row['state']
-        text = f"<b>{display_name}</b><br>"
-        if has_gdp and pd.notna(row['gdp_billions']):
-            text += f"GDP: ${row['gdp_billions']:.1f}B (#{int(row['gdp_rank'])})<br>"
-        text += f"<br><b>{centrality_measure.replace('_', ' ').title()}</b>: {row[centrality_measure]:.4f} (#{int(row[f'rank_{centrality_measure}'])})"
-
-        # Add rank change info if available (52x52 mode)
-        if has_rank_change and pd.notna(row[change_col]):
-            change = int(row[change_col])
-            if change > 0:
-                text += f"<br><span style='color:#2ecc71'>▲ +{change} vs domestic</span>"
-            elif change < 0:
-                text += f"<br><span style='color:#e74c3c'>▼ {change} vs domestic</span>"
-            else:
-                text += f"<br>— No change vs domestic"
-
-        hover_text.append(text)
-
-    # Selection highlighting
-    if selected_state:
-        selected_mask = df['state'] == selected_state
-        marker_sizes = [s * 1.4 if sel else s for s, sel in zip(sizes, selected_mask)]
-        marker_opacities = [1.0 if sel else 0.5 for sel in selected_mask]
-    else:
-        marker_sizes = list(sizes)
-        marker_opacities = 0.85
+    measure_title = centrality_measure.replace('_', ' ').title()
+    name_ser = df['state_name'].fillna(df['state']) if 'state_name' in df.columns else df['state']
+    hover_columns = [df['state'], name_ser, df[centrality_measure], df[f'rank_{centrality_measure}'].astype(int)]
+    hovertemplate = "<b>%{customdata[1]}</b><br>"
+    if 'gdp_billions' in df.columns:
+        # GDP line per row, left out for states without GDP
+        gdp = df['gdp_billions']
+        gdp_line = ("GDP: $" + gdp.map('{:.1f}'.format).astype(str) + "B (#"
+                    + df['gdp_rank'].astype('Int64').astype(str) + ")<br>")
+        hover_columns.append(gdp_line.where(gdp.notna(), ''))
+        hovertemplate += "%{customdata[4]}"
+    hovertemplate += "<br><b>" + measure_title + "</b>: %{customdata[2]:.4f} (#%{customdata[3]})"
+
+    # Add rank change info if available (52x52 mode)
+    if has_rank_change:
+        change = df[change_col]
+        change_str = change.astype('Int64').astype(str)
+        hover_columns.append(pd.Series(np.select(
+            [change > 0, change < 0, change == 0],
+            ["<br><span style='color:#2ecc71'>▲ +" + change_str + " vs domestic</span>",
+             "<br><span style='color:#e74c3c'>▼ " + change_str + " vs domestic</span>",
+             "<br>— No change vs domestic"],
+            default=''
+        ), index=df.index))
+        hovertemplate += "%{customdata[" + str(len(hover_columns) - 1) + "]}"
+    hovertemplate += "<extra></extra>"
+
+    node_customdata = pd.concat(hover_columns, axis=1).to_numpy(dtype=object)
 
     # Color scheme based on mode
-    if dark_mode:
-        colorscale = 'Viridis'
-        map_style = 'carto-darkmatter'
-        paper_bg = '#1a1a2e'
-        font_color = '#ffffff'
-    else:
-        colorscale = 'Viridis'
-        map_style = 'carto-positron'
-        paper_bg = '#ffffff'
-        font_color = '#333333'
+    colors = MAP_COLORS[bool(dark_mode)]
+    font_color = colors['font']
 
-    fig = go.Figure()
+    fig = go.Figure(layout=MAP_LAYOUTS[bool(dark_mode)])
 
     # Add edges first (behind nodes)
     # Hover enabled via invisible midpoint markers - capped at 1000 edges for performance
@@ -102,53 +141,72 @@ def create_network_map(centralities, coordinates, centrality_measure='eigenvecto
             edge_pairs[pair_key]['flows'][direction] = edge['weight']
 
         # Now render edges and build hover layer
-        midpoint_lats = []
-        midpoint_lons = []
+        n_pairs = len(edge_pairs)
+        src_lats = np.empty(n_pairs)
+        src_lons = np.empty(n_pairs)
+        tgt_lats = np.empty(n_pairs)
+        tgt_lons = np.empty(n_pairs)
+        total_weights = np.empty(n_pairs)
+        is_selected = np.zeros(n_pairs, dtype=bool)
         midpoint_texts = []
-        midpoint_sizes = []
 
-        for pair_key, pair_data in edge_pairs.items():
-            coords_data = pair_data['coords']
+        for i, (pair_key, pair_data) in enumerate(edge_pairs.items()):
             flows = pair_data['flows']
-            total_weight = sum(flows.values())
-
-            scaled_width = 0.5 + (total_weight / max_weight) * 3
+            src_lats[i], src_lons[i], tgt_lats[i], tgt_lons[i] = pair_data['coords']
+            total_weights[i] = sum(flows.values())
 
             # Highlight edges connected to selected state
-            if selected_state and selected_state in pair_key:
-                edge_color = 'rgba(255, 193, 7, 0.7)'  # Gold for selected
-                scaled_width *= 1.5
-            else:
-                edge_color = 'rgba(100, 149, 237, 0.3)' if dark_mode else 'rgba(70, 130, 180, 0.4)'
-
-            # Add line trace (visual)
-            fig.add_trace(go.Scattermapbox(
-                lat=[coords_data[0], coords_data[2]],
-                lon=[coords_data[1], coords_data[3]],
-                mode='lines',
-                line=dict(width=scaled_width, color=edge_color),
-                hoverinfo='skip',
-                showlegend=False
-            ))
+            is_selected[i] = bool(selected_state) and selected_state in pair_key
 
             # Build hover text showing both directions
-            mid_lat = (coords_data[0] + coords_data[2]) / 2
-            mid_lon = (coords_data[1] + coords_data[3]) / 2
-
             state_a, state_b = pair_key
             flow_lines = []
             for direction, weight in sorted(flows.items()):
                 flow_lines.append(f"{direction}: ${weight/1e9:.1f}B")
 
-            hover_text = f"<b>{state_a} ↔ {state_b}</b><br>" + "<br>".join(flow_lines)
+            midpoint_texts.append(f"<b>{state_a} ↔ {state_b}</b><br>" + "<br>".join(flow_lines))
+
+        # Width scaling and highlight for all pairs at once
+        base_widths = 0.5 + (total_weights / max_weight) * 3
+        scaled_widths = np.where(is_selected, base_widths * 1.5, base_widths)
+        midpoint_lats = (src_lats + tgt_lats) / 2
+        midpoint_lons = (src_lons + tgt_lons) / 2
+        midpoint_sizes = np.maximum(scaled_widths * 4, 15)  # Min size for hit area
+
+        # One line trace per (selected, width bucket) - segments separated by NaN
+        width_bucket = np.minimum(
+            ((base_widths - 0.5) / 3 * EDGE_WIDTH_BUCKETS).astype(int), EDGE_WIDTH_BUCKETS - 1
+        )
+        other_color = colors['edge']
+        for selected_group in (False, True):
+            edge_color = 'rgba(255, 193, 7, 0.7)' if selected_group else other_color  # Gold for selected
+            for bucket in range(EDGE_WIDTH_BUCKETS):
+                mask = (is_selected == selected_group) & (width_bucket == bucket)
+                n_segments = int(mask.sum())
+                if not n_segments:
+                    continue
+
+                seg_lats = np.full(3 * n_segments, np.nan)
+                seg_lons = np.full(3 * n_segments, np.nan)
+                seg_lats[0::3], seg_lats[1::3] = src_lats[mask], tgt_lats[mask]
+                seg_lons[0::3], seg_lons[1::3] = src_lons[mask], tgt_lons[mask]
+
+                line_width = 0.5 + (bucket + 0.5) * 3 / EDGE_WIDTH_BUCKETS
+                if selected_group:
+                    line_width *= 1.5
 
-            midpoint_lats.append(mid_lat)
-            midpoint_lons.append(mid_lon)
-            midpoint_texts.append(hover_text)
-            midpoint_sizes.append(max(scaled_width * 4, 15))  # Min size for hit area
+                fig.add_trace(go.Scattermapbox(
+                    lat=seg_lats,
+                    lon=seg_lons,
+                    mode='lines',
+                    line=dict(width=line_width, color=edge_color),
+                    hoverinfo='skip',
+                    showlegend=False,
+                    meta=None if selected_group else 'themed-edges'  # Recolored per theme clientside
+                ))
 
         # Add single trace with all midpoints for efficient hover
-        if midpoint_lats:
+        if n_pairs:
             fig.add_trace(go.Scattermapbox(
                 lat=midpoint_lats,
                 lon=midpoint_lons,
@@ -169,9 +227,9 @@ def create_network_map(centralities, coordinates, centrality_measure='eigenvecto
         lon=df['lon'],
         mode='markers',
         marker=dict(
-            size=marker_sizes,
+            size=sizes.tolist(),  # Plain list: styleMap scales it in the browser
             color=color_values,
-            colorscale=colorscale,
+            colorscale='Viridis',
             showscale=True,
             colorbar=dict(
                 title=dict(
@@ -183,62 +241,41 @@ def create_network_map(centralities, coordinates, centrality_measure='eigenvecto
                 len=0.4,
                 y=0.5,
                 tickfont=dict(color=font_color, size=10),
-                bgcolor='rgba(0,0,0,0.3)' if dark_mode else 'rgba(255,255,255,0.8)',
+                bgcolor=colors['colorbar_bg'],
                 borderwidth=0
             ),
-            opacity=marker_opacities
+            opacity=0.85
         ),
-        text=hover_text,
-        hovertemplate='%{text}<extra></extra>',
-        customdata=df['state'].tolist(),
-        name=''
+        customdata=node_customdata,
+        hovertemplate=hovertemplate,
+        name='',
+        meta='nodes'  # Selected state is highlighted clientside
     ))
 
     # Add rank change indicator labels (52x52 mode only, for significant changes)
     if has_rank_change:
-        indicator_lats = []
-        indicator_lons = []
-        indicator_texts = []
-        indicator_colors = []
-
-        for _, row in df.iterrows():
-            if pd.notna(row[change_col]):
-                change = int(row[change_col])
-                # Only show indicators for significant changes (|change| >= 3)
-                if abs(change) >= 3:
-                    indicator_lats.append(row['lat'] + 0.8)  # Offset slightly north
-                    indicator_lons.append(row['lon'])
-                    if change > 0:
-                        indicator_texts.append(f"▲{change}")
-                        indicator_colors.append('#2ecc71')  # Green
-                    else:
-                        indicator_texts.append(f"▼{abs(change)}")
-                        indicator_colors.append('#e74c3c')  # Red
-
-        if indicator_lats:
-            # Add each indicator separately to control color
-            for lat, lon, text, color in zip(indicator_lats, indicator_lons, indicator_texts, indicator_colors):
+        # Only show indicators for significant changes (|change| >= 3); NaN never qualifies
+        change = df[change_col]
+        significant = (change.abs() >= 3).to_numpy()
+        shown_change = change[significant]
+        rising = (shown_change > 0).to_numpy()
+        change_str = shown_change.abs().astype(int).astype(str)
+
+        indicator_lats = (df['lat'][significant] + 0.8).to_numpy()  # Offset slightly north
+        indicator_lons = df['lon'][significant].to_numpy()
+        indicator_texts = ("▲" + change_str).where(rising, "▼" + change_str).to_numpy()
+
+        # Mapbox text traces take a single font color, so one trace per direction
+        for group, color in ((rising, '#2ecc71'), (~rising, '#e74c3c')):  # Green / red
+            if group.any():
                 fig.add_trace(go.Scattermapbox(
-                    lat=[lat],
-                    lon=[lon],
+                    lat=indicator_lats[group],
+                    lon=indicator_lons[group],
                     mode='text',
-                    text=[text],
+                    text=indicator_texts[group],
                     textfont=dict(size=11, color=color, family='Arial Black'),
                     hoverinfo='skip',
                     showlegend=False
                 ))
 
-    fig.update_layout(
-        mapbox=dict(
-            style=map_style,
-            center=dict(lat=39.5, lon=-98.0),
-            zoom=3.3
-        ),
-        margin=dict(l=0, r=0, t=0, b=0),
-        paper_bgcolor=paper_bg,
-        plot_bgcolor=paper_bg,
-        showlegend=False,
-        uirevision='constant'  # Prevents map from resetting on updates
-    )
-
     return fig
@@ -0,0 +1,117 @@
+"""Rankings table component."""
+
+from functools import lru_cache
+
+import numpy as np
+from dash import dash_table
+from data_loader import centralities_base
+
+
+def _rankings_table():
+    """Rankings table frame: abbreviation, name and integer GDP/centrality ranks."""
+    df = centralities_base[['state', 'state_name', 'gdp_rank', 'rank_eigenvector',
+                            'rank_out_degree', 'rank_betweenness']].copy()
+
+    df = df.rename(columns={
+        'state': 'Abbr',
+        'state_name': 'State',
+        'gdp_rank': 'GDP',
+        'rank_eigenvector': 'Eigen',
+        'rank_out_degree': 'OutDeg',
+        'rank_betweenness': 'Betw'
+    })
+
+    for col in ['GDP', 'Eigen', 'OutDeg', 'Betw']:
+        df[col] = df[col].astype(int)
+    return df
+
+
+def _rankings_divergence_styles(dark_mode):
+    """Build the rankings table cell colors for GDP vs centrality divergence.
+
+    Rules match rows by state abbreviation rather than row index, so one list
+    per theme holds for every sort order (including native column sorts).
+    """
+    if dark_mode:
+        green_bg, green_light_bg, green_text = 'rgba(46, 204, 113, 0.3)', 'rgba(46, 204, 113, 0.15)', '#2ecc71'
+        red_bg, red_light_bg, red_text = 'rgba(231, 76, 60, 0.3)', 'rgba(231, 76, 60, 0.15)', '#e74c3c'
+    else:
+        green_bg, green_light_bg, green_text = 'rgba(46, 204, 113, 0.25)', 'rgba(46, 204, 113, 0.12)', '#1a8a4c'
+        red_bg, red_light_bg, red_text = 'rgba(231, 76, 60, 0.25)', 'rgba(231, 76, 60, 0.12)', '#c0392b'
+
+    bins = [(green_bg, green_text), (green_light_bg, green_text), (red_bg, red_text), (red_light_bg, red_text)]
+    states = centralities_base['state'].tolist()
+
+    styles = []
+    for col, measure in [('Eigen', 'eigenvector'), ('OutDeg', 'out_degree'), ('Betw', 'betweenness')]:
+        diff = centralities_base[f'divergence_{measure}'].to_numpy()
+        bin_idx = np.select([diff >= 10, diff >= 5, diff <= -10, diff <= -5], [0, 1, 2, 3], default=-1)
+        for state, b in zip(states, bin_idx.tolist()):
+            if b >= 0:
+                styles.append({
+                    'if': {'filter_query': f'{{Abbr}} = "{state}"', 'column_id': col},
+                    'backgroundColor': bins[b][0],
+                    'color': bins[b][1]
+                })
+    return styles
+
+
+def _rankings_theme(dark_mode):
+    """Table styles for one theme; the selected row highlight is added in the browser."""
+    if dark_mode:
+        text, border, header_bg, selected_bg = 'white', 'rgba(255,255,255,0.05)', 'rgba(255,255,255,0.05)', 'rgba(255, 193, 7, 0.3)'
+    else:
+        text, border, header_bg, selected_bg = '#333', 'rgba(0,0,0,0.08)', 'rgba(0,0,0,0.05)', 'rgba(255, 193, 7, 0.4)'
+
+    return {
+        'cell': {
+            'textAlign': 'center',
+            'padding': '10px 8px',
+            'fontSize': '12px',
+            'backgroundColor': 'transparent',
+            'color': text,
+            'border': 'none',
+            'borderBottom': f'1px solid {border}',
+            'cursor': 'pointer'
+        },
+        'header': {
+            'fontWeight': '600',
+            'backgroundColor': header_bg,
+            'borderBottom': f'1px solid {border}',
+            'cursor': 'default'
+        },
+        'divergence': _rankings_divergence_styles(dark_mode),
+        'selected_bg': selected_bg,
+    }
+
+
+# Table contents only vary by sort measure, so build the three orderings once
+_rankings_df = _rankings_table()
+RANKINGS_COLUMNS = [{'name': c, 'id': c} for c in _rankings_df.columns]
+RANKINGS_RECORDS = {
+    measure: _rankings_df.sort_values(col).reset_index(drop=True).to_dict('records')
+    for measure, col in {'eigenvector': 'Eigen', 'out_degree': 'OutDeg', 'betweenness': 'Betw'}.items()
+}
+
+# Table styles keyed 'dark'/'light' for the browser, which applies them on theme
+# and selection changes (see styleRankingsTable in assets/clientside.js)
+RANKINGS_THEME_DATA = {('dark' if dark else 'light'): _rankings_theme(dark) for dark in (True, False)}
+
+
+@lru_cache(maxsize=None)
+def create_rankings_table(measure='eigenvector'):
+    """Create the rankings table sorted by the given centrality measure.
+
+    The table is theme-neutral; styles are applied clientside once it mounts.
+    Only the measure varies, so each of the three tables is built once; callers
+    must not mutate the returned component.
+    """
+    return dash_table.DataTable(
+        id='rankings-table',
+        data=RANKINGS_RECORDS[measure],
+        columns=RANKINGS_COLUMNS,
+        sort_action='native',
+        fixed_rows={'headers': True},
+        style_table={'overflowX': 'auto', 'overflowY': 'auto', 'maxHeight': '280px'},
+        page_size=51
+    )
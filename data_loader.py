@@ -1,11 +1,22 @@
 """Data loading functions and pre-loaded data for Interstate Trade visualization."""
 
+import json
+import threading
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-import networkx as nx
-import pickle
 from pathlib import Path
 
 
+# Explicit CSV schemas: skip dtype inference and unused columns on load. Centrality
+# scores stay float64 since ranks (and their ties) are derived from them.
+MEASURE_DTYPES = {'betweenness': 'float64', 'eigenvector': 'float64', 'out_degree': 'float64'}
+CENTRALITIES_DTYPES = {
+    'state_id': 'int32', 'label': 'str', **MEASURE_DTYPES,
+    'rank_betweenness': 'int32', 'rank_eigenvector': 'int32', 'rank_out_degree': 'int32',
+}
+
+
 def load_centralities(data_dir="data", network_type="51x51"):
     """Load centrality scores from CSV.
 
@@ -15,49 +26,93 @@ def load_centralities(data_dir="data", network_type="51x51"):
     """
     filename = f"centralities_{network_type}.csv"
     file_path = Path(data_dir) / filename
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, usecols=list(CENTRALITIES_DTYPES), dtype=CENTRALITIES_DTYPES)
     df = df.rename(columns={'label': 'state'})
     return df
 
 
-def load_network(data_dir="data"):
-    """Load the trade network graph."""
-    file_path = Path(data_dir) / "network_graph.gpickle"
-    with open(file_path, 'rb') as f:
-        G = pickle.load(f)
-    return G
+def load_network_stats(data_dir="data"):
+    """Load precomputed network statistics (see scripts/precompute_network.py).
+
+    Returns:
+        Dict with keys: density, num_nodes, num_edges, clustering_coef, reciprocity
+    """
+    file_path = Path(data_dir) / "network_stats.json"
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def load_network_edges(data_dir="data"):
+    """Load the trade network as read-only edge arrays.
+
+    Built offline from network_graph.gpickle by scripts/precompute_network.py.
+
+    Returns:
+        Tuple of (source state_id, target state_id, weight) arrays
+    """
+    file_path = Path(data_dir) / "network_edges.npz"
+    with np.load(file_path) as npz:
+        arrays = npz['source'], npz['target'], npz['weight']
+
+    for arr in arrays:
+        arr.flags.writeable = False
+    return arrays
 
 
 def load_state_coords(data_dir="data"):
     """Load state coordinates for map visualization."""
     file_path = Path(data_dir) / "state_coords.csv"
-    return pd.read_csv(file_path)
+    dtypes = {'state_abbr': 'str', 'state_name': 'str', 'lat': 'float64', 'lon': 'float64'}
+    df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
+    df = df.rename(columns={'state_abbr': 'state'})
+    return df
 
 
 def load_gdp(data_dir="data"):
     """Load state GDP data."""
     file_path = Path(data_dir) / "state_gdp_2017.csv"
-    df = pd.read_csv(file_path)
+    dtypes = {'state_abbrev': 'str', 'gdp_2017_q4_millions': 'float64'}
+    df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
+    df = df.rename(columns={'state_abbrev': 'state'})
     df['gdp_billions'] = df['gdp_2017_q4_millions'] / 1000
     df['gdp_rank'] = df['gdp_billions'].rank(ascending=False, method='min').astype(int)
     return df
 
 
+# Map marker diameter range; nodes scale linearly with centrality up to the max
+MARKER_SIZE_RANGE = (12, 55)
+
+
+def _add_marker_sizes(df, by=None):
+    """Add size_<measure> columns with map marker sizes for each centrality measure.
+
+    With `by`, sizes are scaled to the maximum within each group of that column.
+    """
+    min_size, max_size = MARKER_SIZE_RANGE
+    for measure in ['betweenness', 'eigenvector', 'out_degree']:
+        values = df[measure]
+        max_values = values.max() if by is None else df.groupby(by)[measure].transform('max')
+        df[f'size_{measure}'] = min_size + (values / max_values) * (max_size - min_size)
+    return df
+
+
 def load_filtration_data(data_dir="data"):
     """Load pre-computed filtration results."""
     file_path = Path(data_dir) / "filtration_results_51x51.csv"
-    df = pd.read_csv(file_path)
+    dtypes = {'state_id': 'int32', 'label': 'str', **MEASURE_DTYPES,
+              'threshold': 'float64', 'threshold_label': 'str'}
+    df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
     df = df.rename(columns={'label': 'state'})
 
-    filtration_data = {}
-    for threshold_label in df['threshold_label'].unique():
-        threshold_df = df[df['threshold_label'] == threshold_label].copy()
-        threshold_df['rank_betweenness'] = threshold_df['betweenness'].rank(ascending=False, method='min')
-        threshold_df['rank_eigenvector'] = threshold_df['eigenvector'].rank(ascending=False, method='min')
-        threshold_df['rank_out_degree'] = threshold_df['out_degree'].rank(ascending=False, method='min')
-        filtration_data[threshold_label] = threshold_df.reset_index(drop=True)
+    # Rank all thresholds in one grouped pass, then split by threshold
+    measures = ['betweenness', 'eigenvector', 'out_degree']
+    ranks = df.groupby('threshold_label')[measures].rank(ascending=False, method='min')
+    df = pd.concat([df, ranks.add_prefix('rank_')], axis=1)
 
-    return filtration_data
+    return {
+        threshold_label: _add_marker_sizes(threshold_df.reset_index(drop=True))
+        for threshold_label, threshold_df in df.groupby('threshold_label', sort=False)
+    }
 
 
 def load_commodity_centralities(data_dir="data"):
@@ -68,7 +123,9 @@ def load_commodity_centralities(data_dir="data"):
         out_degree, commodity_code, commodity_name
     """
     file_path = Path(data_dir) / "commodity_centralities.csv"
-    df = pd.read_csv(file_path)
+    dtypes = {'state_id': 'int32', 'label': 'str', **MEASURE_DTYPES,
+              'commodity_code': 'str', 'commodity_name': 'str'}
+    df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
     df = df.rename(columns={'label': 'state'})
     return df
 
@@ -81,7 +138,10 @@ def load_commodity_edges(data_dir="data"):
         (source/target are state abbreviations like 'TX', 'CA')
     """
     file_path = Path(data_dir) / "commodity_edges.csv"
-    df = pd.read_csv(file_path, dtype={'commodity_code': str})
+    # ~80k rows over a few dozen distinct labels: categoricals keep filtering cheap
+    dtypes = {'source': 'category', 'target': 'category', 'commodity_code': 'category',
+              'weight': 'float64'}
+    df = pd.read_csv(file_path, usecols=list(dtypes), dtype=dtypes)
     return df
 
 
@@ -175,70 +235,109 @@ SCTG_NAMES = {
 }
 
 
-def get_top_edges(network, coords, centralities, top_n=50, commodity='all'):
+@lru_cache(maxsize=32)
+def get_top_edges(top_n=50, commodity='all'):
     """Get the top N edges by weight for visualization.
 
+    The aggregate network (commodity='all') is read from the pre-loaded
+    edge_src / edge_tgt / edge_weight arrays. Edges are static, so results are
+    memoized per (top_n, commodity); the returned tuple must not be mutated.
+
     Args:
-        network: NetworkX graph (used when commodity='all')
-        coords: State coordinates DataFrame
-        centralities: Centralities DataFrame (for state_id → label mapping)
         top_n: Number of top edges to return
         commodity: SCTG commodity code or 'all' for aggregate network
     """
-    coords_renamed = coords.rename(columns={'state_abbr': 'state'})
-    coord_lookup = {row['state']: {'lat': row['lat'], 'lon': row['lon']}
-                    for _, row in coords_renamed.iterrows()}
-
     if commodity != 'all' and commodity_edges is not None:
         # Use pre-loaded commodity edge data
         filtered = commodity_edges[commodity_edges['commodity_code'] == commodity]
-        filtered = filtered.nlargest(top_n, 'weight')
-
-        top_edges = []
-        for _, row in filtered.iterrows():
-            src, tgt = row['source'], row['target']
-            if src in coord_lookup and tgt in coord_lookup:
-                top_edges.append({
-                    'source': src,
-                    'target': tgt,
-                    'weight': row['weight'],
-                    'source_lat': coord_lookup[src]['lat'],
-                    'source_lon': coord_lookup[src]['lon'],
-                    'target_lat': coord_lookup[tgt]['lat'],
-                    'target_lon': coord_lookup[tgt]['lon']
-                })
-        return top_edges
-
-    # Aggregate network (original behavior)
-    id_to_label = dict(zip(centralities['state_id'], centralities['state']))
-
-    edges_with_weight = [
-        (source, target, data['weight'])
-        for source, target, data in network.edges(data=True)
-    ]
-    edges_sorted = sorted(edges_with_weight, key=lambda x: x[2], reverse=True)
-
-    top_edges = []
-    for source_id, target_id, weight in edges_sorted[:top_n]:
-        source_label = id_to_label.get(source_id)
-        target_label = id_to_label.get(target_id)
+        top = filtered[['source', 'target', 'weight']].nlargest(top_n, 'weight')
+    else:
+        # Aggregate network: argpartition finds the N-th largest weight, edges above it
+        # plus the earliest edges tied with it make the cut (graph order for ties, as
+        # a full stable sort would give), and only those N are sorted
+        if top_n < len(edge_weight):
+            cutoff = edge_weight[np.argpartition(-edge_weight, top_n - 1)[top_n - 1]]
+            above = np.flatnonzero(edge_weight > cutoff)
+            tied = np.flatnonzero(edge_weight == cutoff)[:top_n - len(above)]
+            top_idx = np.concatenate([above, tied])
+        else:
+            top_idx = np.arange(len(edge_weight))
+        top_idx = top_idx[np.argsort(-edge_weight[top_idx], kind='stable')]
+
+        top = pd.DataFrame({
+            'source': pd.Series(edge_src[top_idx]).map(state_id_to_label),
+            'target': pd.Series(edge_tgt[top_idx]).map(state_id_to_label),
+            'weight': edge_weight[top_idx],
+        }).dropna(subset=['source', 'target'])
+
+    # Inner merges drop edges without map coordinates and keep weight order
+    endpoints = coords[['state', 'lat', 'lon']]
+    top = (top
+           .merge(endpoints.rename(columns={'state': 'source', 'lat': 'source_lat', 'lon': 'source_lon'}),
+                  on='source', validate='many_to_one')
+           .merge(endpoints.rename(columns={'state': 'target', 'lat': 'target_lat', 'lon': 'target_lon'}),
+                  on='target', validate='many_to_one'))
+
+    return tuple(top[['source', 'target', 'weight', 'source_lat', 'source_lon',
+                      'target_lat', 'target_lon']].to_dict('records'))
+
+
+@lru_cache(maxsize=256)
+def get_state_edges(state, commodity='all', flow_direction='both'):
+    """Get all edges touching one state, for the selected-state map view.
+
+    Memoized per (state, commodity, flow_direction); the returned tuple must
+    not be mutated.
 
-        if not source_label or not target_label:
-            continue
-        if source_label not in coord_lookup or target_label not in coord_lookup:
-            continue
-
-        top_edges.append({
-            'source': source_label,
-            'target': target_label,
-            'weight': weight,
-            'source_lat': coord_lookup[source_label]['lat'],
-            'source_lon': coord_lookup[source_label]['lon'],
-            'target_lat': coord_lookup[target_label]['lat'],
-            'target_lon': coord_lookup[target_label]['lon']
-        })
+    Args:
+        state: State abbreviation (e.g., 'TX')
+        commodity: SCTG commodity code or 'all' for aggregate network
+        flow_direction: 'outbound', 'inbound' or 'both'
+    """
+    edges = []
+    if commodity != 'all' and commodity_edges is not None:
+        # Use commodity-specific edges for selected state
+        filtered = commodity_edges[commodity_edges['commodity_code'] == commodity]
+        if flow_direction == 'outbound':
+            filtered = filtered[filtered['source'] == state]
+        elif flow_direction == 'inbound':
+            filtered = filtered[filtered['target'] == state]
+        else:
+            filtered = filtered[(filtered['source'] == state) | (filtered['target'] == state)]
+
+        for src, tgt, w in zip(filtered['source'].tolist(), filtered['target'].tolist(),
+                               filtered['weight'].tolist()):
+            if src in coords_lookup and tgt in coords_lookup:
+                (src_lat, src_lon), (tgt_lat, tgt_lon) = coords_lookup[src], coords_lookup[tgt]
+                edges.append({
+                    'source': src, 'target': tgt, 'weight': w,
+                    'source_lat': src_lat, 'source_lon': src_lon,
+                    'target_lat': tgt_lat, 'target_lon': tgt_lon
+                })
+    else:
+        # Aggregate network edges for selected state
+        state_id = state_label_to_id.get(state)
+
+        # Apply flow direction filter
+        if flow_direction == 'outbound':
+            include_edge = edge_src == state_id
+        elif flow_direction == 'inbound':
+            include_edge = edge_tgt == state_id
+        else:  # 'both'
+            include_edge = (edge_src == state_id) | (edge_tgt == state_id)
+
+        for s, t, w in zip(edge_src[include_edge].tolist(), edge_tgt[include_edge].tolist(),
+                           edge_weight[include_edge].tolist()):
+            s_label, t_label = state_id_to_label.get(s), state_id_to_label.get(t)
+            if s_label and t_label and s_label in coords_lookup and t_label in coords_lookup:
+                (src_lat, src_lon), (tgt_lat, tgt_lon) = coords_lookup[s_label], coords_lookup[t_label]
+                edges.append({
+                    'source': s_label, 'target': t_label, 'weight': w,
+                    'source_lat': src_lat, 'source_lon': src_lon,
+                    'target_lat': tgt_lat, 'target_lon': tgt_lon
+                })
 
-    return top_edges
+    return tuple(edges)
 
 
 # =============================================================================
@@ -249,8 +348,9 @@ print("Loading data...")
 
 # Load raw data
 coords = load_state_coords()
-network = load_network()
-filtration_data = load_filtration_data()
+# State abbreviation -> (lat, lon)
+coords_lookup = dict(zip(coords['state'].tolist(), zip(coords['lat'].tolist(), coords['lon'].tolist())))
+edge_src, edge_tgt, edge_weight = load_network_edges()
 gdp = load_gdp()
 commodity_centralities_raw = load_commodity_centralities()
 commodity_edges = load_commodity_edges()
@@ -260,74 +360,122 @@ centralities_51x51 = load_centralities(network_type="51x51")
 centralities_52x52 = load_centralities(network_type="52x52")
 
 
-def _prepare_centralities(df):
-    """Merge GDP and state_name into centralities dataframe."""
-    df = df.merge(
-        gdp[['state_abbrev', 'gdp_billions', 'gdp_rank']],
-        left_on='state', right_on='state_abbrev', how='left'
-    ).drop(columns=['state_abbrev'])
+# GDP, state names and map coordinates per state, joined once for every centralities merge
+_state_meta = gdp[['state', 'gdp_billions', 'gdp_rank']].merge(
+    coords[['state', 'state_name', 'lat', 'lon']], on='state', validate='one_to_one'
+)
 
-    df = df.merge(
-        coords[['state_abbr', 'state_name']],
-        left_on='state', right_on='state_abbr', how='left'
-    ).drop(columns=['state_abbr'])
 
-    return df
+def _prepare_centralities(df):
+    """Merge GDP, state_name and map coordinates into centralities dataframe."""
+    return df.merge(_state_meta, on='state', how='left', validate='many_to_one')
 
 
 # Prepare both datasets
-centralities_51x51 = _prepare_centralities(centralities_51x51)
+centralities_51x51 = _add_marker_sizes(_prepare_centralities(centralities_51x51))
 centralities_52x52 = _prepare_centralities(centralities_52x52)
 
+# GDP rank minus centrality rank per measure (positive = outperforms GDP)
+for measure in ['betweenness', 'eigenvector', 'out_degree']:
+    centralities_51x51[f'divergence_{measure}'] = centralities_51x51['gdp_rank'] - centralities_51x51[f'rank_{measure}']
+
 # Default to 51x51 for backwards compatibility
 centralities_base = centralities_51x51
+# Per-state rows for the drawer; to_dict yields native Python ints for the integer rank columns
+centralities_by_state = centralities_base.set_index('state').to_dict('index')
+
+# State id <-> label for the aggregate network
+state_id_to_label = dict(zip(centralities_base['state_id'].tolist(), centralities_base['state']))
+state_label_to_id = {label: state_id for state_id, label in state_id_to_label.items()}
+
+
+def _summarize_state_trade(top_partners=8):
+    """Outbound/inbound totals and largest trading partners per state label.
+
+    The aggregate network is static, so this runs once instead of per drawer open.
+    """
+    summary = {}
+    for state_id, label in state_id_to_label.items():
+        is_out = edge_src == state_id
+        is_in = edge_tgt == state_id
+        partners = (
+            [(state_id_to_label[t], w, 'out') for t, w in zip(edge_tgt[is_out].tolist(), edge_weight[is_out].tolist())]
+            + [(state_id_to_label[s], w, 'in') for s, w in zip(edge_src[is_in].tolist(), edge_weight[is_in].tolist())]
+        )
+        partners.sort(key=lambda x: x[1], reverse=True)
+        summary[label] = {
+            'outbound': edge_weight[is_out].sum(),
+            'inbound': edge_weight[is_in].sum(),
+            'partners': partners[:top_partners],
+        }
+    return summary
+
+
+state_trade = _summarize_state_trade()
 
 # Compute rank changes between 51x51 and 52x52 (for boundary sensitivity visualization)
 # Only for the 51 states that exist in both (exclude RoW from 52x52)
 states_51 = set(centralities_51x51['state'])
-centralities_52x52_states_only = centralities_52x52[centralities_52x52['state'].isin(states_51)].copy()
-
-rank_changes = centralities_51x51[['state']].copy()
-for measure in ['betweenness', 'eigenvector', 'out_degree']:
-    rank_51 = centralities_51x51.set_index('state')[f'rank_{measure}']
-    rank_52 = centralities_52x52_states_only.set_index('state')[f'rank_{measure}']
-    # Positive = improved rank (lower number = better)
-    rank_changes[f'{measure}_change'] = (rank_51 - rank_52).reindex(rank_changes['state']).values
-
-# Compute network stats
-density = nx.density(network)
-num_edges = network.number_of_edges()
-num_nodes = len(centralities_51x51)
-clustering_coef = nx.average_clustering(network, weight='weight')
-reciprocity = nx.reciprocity(network)
+centralities_52x52_states_only = _add_marker_sizes(
+    centralities_52x52[centralities_52x52['state'].isin(states_51)].reset_index(drop=True)
+)
+
+_rank_cols = ['rank_betweenness', 'rank_eigenvector', 'rank_out_degree']
+_ranks_51 = centralities_51x51.set_index('state')[_rank_cols]
+_ranks_52 = centralities_52x52_states_only.set_index('state').reindex(_ranks_51.index)[_rank_cols]
+# Positive = improved rank (lower number = better)
+rank_changes = pd.DataFrame(
+    _ranks_51.to_numpy() - _ranks_52.to_numpy(),
+    columns=['betweenness_change', 'eigenvector_change', 'out_degree_change'],
+    index=_ranks_51.index,
+).reset_index()
+
+# Network stats (static, precomputed offline)
+network_stats = load_network_stats()
+density = network_stats['density']
+num_edges = network_stats['num_edges']
+num_nodes = network_stats['num_nodes']
+clustering_coef = network_stats['clustering_coef']
+reciprocity = network_stats['reciprocity']
 
 # Prepare commodity centralities (add ranks per commodity)
 def _prepare_commodity_centralities(df):
-    """Add ranks within each commodity code."""
-    result_dfs = []
-    for code in df['commodity_code'].unique():
-        code_df = df[df['commodity_code'] == code].copy()
-        code_df['rank_betweenness'] = code_df['betweenness'].rank(ascending=False, method='min')
-        code_df['rank_eigenvector'] = code_df['eigenvector'].rank(ascending=False, method='min')
-        code_df['rank_out_degree'] = code_df['out_degree'].rank(ascending=False, method='min')
+    """Add ranks and marker sizes within each commodity code, plus GDP and map columns."""
+    measures = ['betweenness', 'eigenvector', 'out_degree']
+    ranks = df.groupby('commodity_code')[measures].rank(ascending=False, method='min')
+    df = pd.concat([df, ranks.add_prefix('rank_')[[f'rank_{m}' for m in measures]]], axis=1)
 
-        # Merge GDP and state names
-        code_df = code_df.merge(
-            gdp[['state_abbrev', 'gdp_billions', 'gdp_rank']],
-            left_on='state', right_on='state_abbrev', how='left'
-        ).drop(columns=['state_abbrev'], errors='ignore')
+    return _add_marker_sizes(_prepare_centralities(df), by='commodity_code')
 
-        code_df = code_df.merge(
-            coords[['state_abbr', 'state_name']],
-            left_on='state', right_on='state_abbr', how='left'
-        ).drop(columns=['state_abbr'], errors='ignore')
 
-        result_dfs.append(code_df)
+commodity_centralities = _prepare_commodity_centralities(commodity_centralities_raw)
+# Split once by code so commodity lookups skip the boolean mask over every row
+commodity_centralities_by_code = {
+    code: code_df.reset_index(drop=True)
+    for code, code_df in commodity_centralities.groupby('commodity_code', sort=False)
+}
 
-    return pd.concat(result_dfs, ignore_index=True)
+# Filtration results are only needed for betweenness at a non-full threshold,
+# so they are loaded on first use rather than at startup
+_filtration_data = None
+_filtration_lock = threading.Lock()
 
 
-commodity_centralities = _prepare_commodity_centralities(commodity_centralities_raw)
+def get_filtration_data():
+    """Return map-ready filtration results by threshold label, loading them on first call.
+
+    Each threshold's frame is merged with GDP, state names and coordinates once,
+    like the other centralities datasets. Callers must not mutate the frames.
+    """
+    global _filtration_data
+    with _filtration_lock:
+        if _filtration_data is None:
+            _filtration_data = {
+                threshold_label: _prepare_centralities(threshold_df)
+                for threshold_label, threshold_df in load_filtration_data().items()
+            }
+    return _filtration_data
+
 
 # Get list of available commodity codes
 available_commodities = sorted(commodity_centralities['commodity_code'].unique().tolist())
@@ -341,13 +489,13 @@ def get_centralities_for_commodity(commodity_code):
         commodity_code: SCTG code (e.g., '34' for Machinery) or 'all' for aggregate
 
     Returns:
-        DataFrame with centralities for that commodity (same format as centralities_51x51)
+        DataFrame with centralities for that commodity (same format as centralities_51x51),
+        shared across calls so callers must not mutate it; empty for unknown codes
     """
     if commodity_code == 'all':
         return centralities_51x51
 
-    code_df = commodity_centralities[commodity_centralities['commodity_code'] == commodity_code].copy()
-    return code_df.reset_index(drop=True)
+    return commodity_centralities_by_code.get(commodity_code, commodity_centralities.iloc[:0])
 
 
 print("Data loaded.")
@@ -0,0 +1,65 @@
+"""Precompute the network artifacts the app loads at startup.
+
+The trade network is static, so the NetworkX graph is only read here, offline:
+
+- data/network_edges.npz: (source, target, weight) edge arrays
+- data/network_stats.json: density, node and edge counts, weighted clustering, reciprocity
+
+Rerun whenever data/network_graph.gpickle changes.
+
+Usage:
+    python scripts/precompute_network.py
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def edge_arrays(G):
+    """Flatten a graph's weighted edges into (source, target, weight) arrays in graph order."""
+    edges = list(G.edges(data='weight'))
+    source = np.fromiter((s for s, _, _ in edges), dtype=np.int32, count=len(edges))
+    target = np.fromiter((t for _, t, _ in edges), dtype=np.int32, count=len(edges))
+    weight = np.fromiter((w for _, _, w in edges), dtype=np.float64, count=len(edges))
+    return source, target, weight
+
+
+def compute_network_stats(G):
+    """Compute the summary statistics shown in the stats badge."""
+    return {
+        'density': nx.density(G),
+        'num_nodes': G.number_of_nodes(),
+        'num_edges': G.number_of_edges(),
+        'clustering_coef': nx.average_clustering(G, weight='weight'),
+        'reciprocity': nx.reciprocity(G),
+    }
+
+
+def main():
+    with open(DATA_DIR / "network_graph.gpickle", 'rb') as f:
+        G = pickle.load(f)
+
+    source, target, weight = edge_arrays(G)
+    edges_path = DATA_DIR / "network_edges.npz"
+    np.savez_compressed(edges_path, source=source, target=target, weight=weight)
+    print(f"Wrote {edges_path} ({len(weight):,} edges)")
+
+    stats = compute_network_stats(G)
+    stats_path = DATA_DIR / "network_stats.json"
+    with open(stats_path, 'w') as f:
+        json.dump(stats, f, indent=2)
+        f.write('\n')
+
+    print(f"Wrote {stats_path}")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +0,0 @@
-from .css import CUSTOM_CSS
-
-__all__ = ['CUSTOM_CSS']
@@ -0,0 +1,25 @@
+"""Map figure tests. Run from the repo root: python -m pytest"""
+
+from callbacks.interactions import _build_map_figure
+from components.map import create_network_map
+from data_loader import coords, get_centralities_for_commodity
+
+# Crude Petroleum: listed in the commodity dropdown but has no centrality rows
+EMPTY_COMMODITY = '16'
+
+
+def test_empty_commodity_builds_empty_map():
+    centralities = get_centralities_for_commodity(EMPTY_COMMODITY)
+    assert centralities.empty
+
+    fig = create_network_map(centralities, coords, 'eigenvector')
+    nodes = [trace for trace in fig.data if trace.meta == 'nodes']
+    assert len(nodes) == 1
+    assert len(nodes[0].lat) == 0
+
+
+def test_empty_commodity_map_callback():
+    for show_edges in (False, True):
+        fig = _build_map_figure('eigenvector', 'full_network', show_edges, 50, None,
+                                '51x51', EMPTY_COMMODITY, 'both')
+        assert 'data' in fig